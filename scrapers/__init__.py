@@ -1 +1 @@
-from .normalizer import normalize_events, dedup_events
+from .normalizer import normalize_events, dedup_events, fuzzy_dedup_events, normalize_name
@@ -7,8 +7,17 @@ Extracted from race_registry_scraper.py so it can be imported by
 other scraper or pipeline components.
 """
 
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Any
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
 
 # Output schema for all normalized events
 SCHEMA = {
@@ -22,6 +31,56 @@ SCHEMA = {
     "source_url":        str,   # API URL this record came from
 }
 
+# Candidate source keys per field, in priority order
+# (snake_case, camelCase, PascalCase variants seen across platforms)
+_NAME_KEYS = (
+    "event_name", "name", "race_name", "title",
+    "EventName", "eventName", "RaceName", "event",
+)
+_DATE_KEYS = (
+    "race_date", "date", "event_date", "start_date",
+    "EventDate", "eventDate", "RaceDate", "scheduled_date",
+)
+_CITY_KEYS = (
+    "city", "location", "venue", "place",
+    "City", "Location", "Venue", "Place",
+)
+_DISTANCE_KEYS = (
+    "categories", "distances", "race_types",
+    "Categories", "Distances", "race_categories",
+)
+_PARTICIPANT_KEYS = (
+    "participant_count", "participants", "total_participants",
+    "count", "total_runners", "finishers", "ParticipantCount",
+)
+_EVENT_ID_KEYS = ("id", "event_id", "race_id", "EventId", "Id")
+
+# Output field -> candidate source keys. Drives _normalize_item (via
+# _EXTRACTORS); extend here when a platform uses a new field name.
+FIELD_MAP: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("race_name",         _NAME_KEYS),
+    ("race_date",         _DATE_KEYS),
+    ("city",              _CITY_KEYS),
+    ("distances",         _DISTANCE_KEYS),
+    ("participant_count", _PARTICIPANT_KEYS),
+    ("event_id",          _EVENT_ID_KEYS),
+)
+
+# Minimal subset used by _is_event to decide whether an item is an event
+_IS_EVENT_KEYS = ("event_name", "name", "race_name", "title", "EventName", "eventName")
+
+# Envelope keys that may wrap a response's event list, in probe order
+_ENVELOPE_KEYS = ("events", "data", "results", "races", "items", "list", "eventList", "Events", "Data")
+
+# Envelope key each known platform wraps its event list in. Tried before
+# the generic probe; never modified at runtime. Note this can differ from
+# the probe: a response carrying several list envelopes (e.g. both "events"
+# and "data") yields the platform's own key, not the first in
+# _ENVELOPE_KEYS, which is the list that platform actually serves events in.
+_SOURCE_ENVELOPE: dict[str, str] = {
+    "STS":     "events",
+    "iFinish": "data",
+}
 
 def normalize_events(raw: Any, source: str, source_url: str) -> list[dict]:
     """
@@ -40,10 +99,35 @@ def normalize_events(raw: Any, source: str, source_url: str) -> list[dict]:
     Returns:
         List of normalized event dicts matching SCHEMA
     """
-    items = _extract_items(raw)
+    items = _source_items(raw, source)
     return [_normalize_item(item, source, source_url) for item in items if _is_event(item)]
 
 
+def _source_items(raw: Any, source: str) -> list:
+    """
+    Extract event items, trying source's known envelope key first.
+
+    Falls back to the generic _extract_items probe when source has no
+    _SOURCE_ENVELOPE entry or its key holds no non-empty list.
+    """
+    if isinstance(raw, dict):
+        envelope = _SOURCE_ENVELOPE.get(source)
+        if envelope is not None:
+            items = raw.get(envelope)
+            if items and isinstance(items, list):
+                return items
+
+    return _extract_items(raw)
+
+
+def _find_envelope(raw: dict):
+    """Return the first common envelope key holding a list, else None."""
+    for key in _ENVELOPE_KEYS:
+        if isinstance(raw.get(key), list):
+            return key
+    return None
+
+
 def _extract_items(raw: Any) -> list:
     """Extract the list of event items from any response shape."""
     if isinstance(raw, list):
@@ -51,9 +135,9 @@ def _extract_items(raw: Any) -> list:
 
     if isinstance(raw, dict):
         # Try common envelope keys
-        for key in ["events", "data", "results", "races", "items", "list", "eventList", "Events", "Data"]:
-            if key in raw and isinstance(raw[key], list):
-                return raw[key]
+        envelope = _find_envelope(raw)
+        if envelope is not None:
+            return raw[envelope]
 
         # Check if the dict itself looks like a single event
         if any(k in raw for k in ["name", "event_name", "race_name", "title", "EventName"]):
@@ -66,55 +150,57 @@ def _is_event(item: Any) -> bool:
     """Return True if item has at least a name field (minimal valid event)."""
     if not isinstance(item, dict):
         return False
-    name = _first(item, ["event_name", "name", "race_name", "title", "EventName", "eventName"])
-    return bool(name and str(name).strip())
+    return _first(item, _IS_EVENT_KEYS) is not None
 
 
 def _normalize_item(item: dict, source: str, source_url: str) -> dict:
     """Map raw item fields to WONE schema."""
-    return {
-        "race_name": _clean(_first(item, [
-            "event_name", "name", "race_name", "title",
-            "EventName", "eventName", "RaceName", "event"
-        ])),
-        "race_date": _clean(_first(item, [
-            "race_date", "date", "event_date", "start_date",
-            "EventDate", "eventDate", "RaceDate", "scheduled_date"
-        ])),
-        "city": _clean(_first(item, [
-            "city", "location", "venue", "place",
-            "City", "Location", "Venue", "Place"
-        ])),
-        "distances": _clean(_first(item, [
-            "categories", "distances", "race_types",
-            "Categories", "Distances", "race_categories"
-        ])),
-        "participant_count": _clean(_first(item, [
-            "participant_count", "participants", "total_participants",
-            "count", "total_runners", "finishers", "ParticipantCount"
-        ])),
-        "event_id": _clean(_first(item, [
-            "id", "event_id", "race_id", "EventId", "Id"
-        ])),
-        "timing_company": source,
-        "source_url": source_url,
-    }
-
-
-def _first(d: dict, keys: list) -> Any:
-    """Return the first non-None, non-empty value from a list of dict keys."""
-    for k in keys:
-        v = d.get(k)
-        if v is not None and str(v).strip():
-            return v
-    return None
+    out = {field: extract(item) for field, extract in _EXTRACTORS}
+    out["timing_company"] = source
+    out["source_url"] = source_url
+    return out
+
 
+def _make_extractor(keys: tuple):
+    """
+    Build the value extractor for one output field.
 
-def _clean(value: Any) -> str:
-    """Safely convert a value to a clean string."""
-    if value is None:
+    The returned function scans keys in priority order and returns the
+    first non-blank value as a stripped string. keys are bound once and
+    value coercion is inlined, so each field costs a single call.
+    """
+    def extract(d: dict) -> str:
+        for k in keys:
+            v = d.get(k)
+            if v is not None:
+                s = (v if type(v) is str else str(v)).strip()
+                if s:
+                    return s
         return ""
-    return str(value).strip()
+
+    return extract
+
+
+# (output field, extractor) pairs, specialized from FIELD_MAP at import
+_EXTRACTORS = tuple((field, _make_extractor(keys)) for field, keys in FIELD_MAP)
+
+
+def _first(d: dict, keys: tuple, _get=dict.get) -> Any:
+    """
+    Return the first non-blank value among keys, unconverted.
+
+    Strings are tested with isspace() rather than stripped, so no copy is
+    made; any other value counts only if truthy (0, False, [] and {} are
+    not names). Returns None when no key holds a usable value.
+    """
+    for k in keys:
+        v = _get(d, k)
+        if type(v) is str:
+            if v and not v.isspace():
+                return v
+        elif v:
+            return v
+    return None
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -135,7 +221,7 @@ def dedup_events(events: list[dict]) -> tuple[list[dict], list[dict]]:
     Returns:
         (unique, duplicates)
     """
-    seen: set[tuple] = set()
+    seen: set[int] = set()
     unique: list[dict] = []
     duplicates: list[dict] = []
 
@@ -150,15 +236,104 @@ def dedup_events(events: list[dict]) -> tuple[list[dict], list[dict]]:
     return unique, duplicates
 
 
-def _dedup_key(event: dict) -> tuple:
-    """Generate a deduplication key for an event."""
-    name_norm = (
-        event.get("race_name", "")
-        .lower()
-        .strip()
-        .replace("  ", " ")
-    )
+def _dedup_key(event: dict) -> int:
+    """
+    Generate a deduplication key for an event.
+
+    The (name, year) pair is folded into one 64-bit string hash, which keeps
+    the seen-set to plain ints instead of tuples of two strings.
+    """
+    name_norm = normalize_name(event.get("race_name") or "")
     # Extract year from date string
     date_str = event.get("race_date", "")
     year = date_str[:4] if len(date_str) >= 4 else event.get("year", "")
-    return (name_norm, str(year))
+    return hash(f"{name_norm}\x00{year}")
+
+
+# Fuzzy dedup: name words, digit runs that must agree, year in a date
+_WORD_RE   = re.compile(r"\w+")
+_DIGITS_RE = re.compile(r"\d+")
+_YEAR_RE   = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+def fuzzy_dedup_events(events: list[dict], threshold: float = 90.0) -> tuple[list[dict], list[dict]]:
+    """
+    Deduplicate events by normalized name + year, catching near-duplicate names.
+
+    Strategy:
+    1. Exact: lowercased race_name words (punctuation/whitespace ignored) + year
+    2. Fuzzy: name similarity >= threshold (0-100) against earlier events
+       in the same block, and the same city when both events have one
+       -> keep first occurrence
+
+    Blocks are keyed by (year, first 3 name chars, digit runs in the name),
+    so comparisons stay within small buckets and "10K" / "21K" variants of
+    the same race are never merged. Uses rapidfuzz when installed, else difflib.
+
+    Args:
+        events:    List of normalized event dicts
+        threshold: Minimum similarity (0-100) to treat two names as duplicates
+
+    Returns:
+        (unique, duplicates)
+    """
+    seen: set[tuple] = set()
+    blocks: dict[tuple, list[tuple[str, str]]] = defaultdict(list)  # -> [(name, city)]
+    unique: list[dict] = []
+    duplicates: list[dict] = []
+
+    for event in events:
+        name = normalize_name(event.get("race_name") or "")
+        city = normalize_name(event.get("city") or "")
+        year = _event_year(event)
+        kept = blocks[(year, name[:3], tuple(_DIGITS_RE.findall(name)))]
+
+        # A known city on both sides must agree before names are compared:
+        # "Run for Rivers Goa" / "Run for Rivers Gaya" are different races
+        candidates = [n for n, c in kept if not city or not c or c == city]
+        if (name, year) in seen or _has_near_match(name, candidates, threshold):
+            duplicates.append(event)
+        else:
+            seen.add((name, year))
+            kept.append((name, city))
+            unique.append(event)
+
+    return unique, duplicates
+
+
+@lru_cache(maxsize=8192)
+def normalize_name(name: Any) -> str:
+    """
+    Lowercase a race name and reduce it to its words joined by single spaces.
+
+    One regex pass: punctuation and whitespace runs both act as separators,
+    so "Half-Marathon" and "Half  Marathon" normalize the same. This is the
+    name key for every dedup pass (exact, fuzzy and per-site scraping), so
+    they all agree on what counts as the same race.
+
+    Cached: the same race names recur across years, sites and repeat dedup
+    runs, so most calls skip the regex pass entirely.
+    """
+    return " ".join(_WORD_RE.findall(str(name).lower()))
+
+
+def _event_year(event: dict) -> str:
+    """Return the event's year from its year field or race_date, else ""."""
+    for value in (event.get("year"), event.get("race_date")):
+        if value is not None:
+            match = _YEAR_RE.search(str(value))
+            if match:
+                return match.group()
+    return ""
+
+
+def _has_near_match(name: str, candidates: list[str], threshold: float) -> bool:
+    """Return True if any candidate name scores >= threshold against name."""
+    if not candidates:
+        return False
+    if process is not None:
+        return process.extractOne(name, candidates, scorer=fuzz.ratio, score_cutoff=threshold) is not None
+    return any(
+        SequenceMatcher(None, name, c).ratio() * 100 >= threshold
+        for c in candidates
+    )
@@ -27,6 +27,9 @@ Usage:
   # Scrape a single site only
   python scrapers/race_registry_scraper.py --mode=direct --site=mysamay
 
+  # Ignore responses cached in output/.http_cache (24h) and re-fetch
+  python scrapers/race_registry_scraper.py --mode=direct --refresh
+
   # Dedup combined output
   python scrapers/race_registry_scraper.py --dedup
 """
@@ -34,26 +37,37 @@ Usage:
 import asyncio
 import json
 import csv
+import re
 import sys
 import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterable
+
+# Allow running as a script (python scrapers/race_registry_scraper.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scrapers.normalizer import normalize_events, fuzzy_dedup_events, normalize_name
 
 try:
-    import requests
+    import aiohttp
 except ImportError:
-    requests = None
+    aiohttp = None
 
 try:
-    from playwright.async_api import async_playwright
+    import orjson
 except ImportError:
-    async_playwright = None
+    orjson = None
 
 try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
+    from playwright.async_api import async_playwright
 except ImportError:
-    PANDAS_AVAILABLE = False
+    async_playwright = None
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CONFIGURATION
@@ -104,6 +118,44 @@ MYRACEINDIA_YEAR_PARAM  = "year"
 DEFAULT_YEARS = list(range(2017, 2026))
 OUTPUT_DIR    = Path("./output")
 
+# Default headers for the shared direct-mode HTTP session
+DIRECT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+    "Accept": "application/json, text/plain, */*",
+}
+
+# Direct mode: max in-flight requests across all sites, and open
+# connections per host (be polite to the APIs)
+DIRECT_MAX_CONCURRENCY = 20
+DIRECT_MAX_PER_HOST    = 8
+
+# Direct mode: raw API responses are cached on disk and reused for this many
+# seconds, so a re-run only goes to the network for missing or stale years
+HTTP_CACHE_DIR = OUTPUT_DIR / ".http_cache"
+HTTP_CACHE_TTL = 24 * 60 * 60
+
+# Playwright mode: max sites scraped at once (one browser context each), and
+# the ceiling in seconds on waiting for a page's race-data XHR after loading
+PLAYWRIGHT_MAX_CONTEXTS = 3
+PLAYWRIGHT_DATA_TIMEOUT = 10
+
+# Scroll to the bottom, then resolve once the page is idle (500ms ceiling)
+SCROLL_AND_IDLE_JS = """async () => {
+    window.scrollTo(0, document.body.scrollHeight);
+    await new Promise(r => window.requestIdleCallback
+        ? window.requestIdleCallback(r, {timeout: 500})
+        : setTimeout(r, 500));
+}"""
+
+# Direct-mode responses totalling at least this many bytes per site are
+# parsed + normalized in a process pool instead of in-process
+PARALLEL_NORMALIZE_MIN_BYTES = 8 * 1024 * 1024
+
+# Transient HTTP failures are retried with exponential backoff (0.5s, 1s, 2s)
+RETRY_STATUSES = (502, 503, 504)
+MAX_RETRIES    = 3
+RETRY_BACKOFF  = 0.5
+
 SITE_CONFIGS = {
     "STS": {
         "label": "SportTimingSolutions",
@@ -154,6 +206,40 @@ SITE_CONFIGS = {
 }
 
 
+# Keywords that mark an XHR/fetch body as race data. Compiled once so each
+# raw body is scanned in a single case-insensitive pass, without a copy.
+# Discovery casts the wider net (finisher lists are results APIs too);
+# playwright scraping only needs bodies that can hold events.
+_DISCOVER_KEYWORDS_RE = re.compile(rb"event|race|marathon|run|result|timing|finisher", re.IGNORECASE)
+_SCRAPE_KEYWORDS_RE   = re.compile(rb"event|race|marathon|result", re.IGNORECASE)
+
+
+def _json_loads(raw: bytes):
+    """Parse a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+async def _read_api_json(response, keywords_re):
+    """
+    Return (raw, parsed) bodies of an XHR/fetch response that mentions race
+    keywords, else None.
+
+    The keyword regex runs over the raw bytes, so non-matching responses
+    are never JSON-decoded. Unreadable or non-JSON bodies yield None.
+    """
+    if response.request.resource_type not in ("xhr", "fetch"):
+        return None
+    try:
+        raw = await response.body()
+        if not keywords_re.search(raw):
+            return None
+        return raw, _json_loads(raw)
+    except Exception:
+        return None
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # DISCOVER MODE
 # Opens a visible browser. Interact with year/race dropdowns.
@@ -184,26 +270,23 @@ async def discover_apis():
                 page = await browser.new_page()
 
                 async def on_response(response, site=site_key):
-                    if response.request.resource_type not in ("xhr", "fetch"):
+                    hit = await _read_api_json(response, _DISCOVER_KEYWORDS_RE)
+                    if hit is None:
                         return
-                    try:
-                        body = await response.json()
-                        body_str = json.dumps(body).lower()
-                        keywords = ["event", "race", "marathon", "run", "result", "timing"]
-                        if any(k in body_str for k in keywords):
-                            method = response.request.method
-                            req_url = response.url
-                            post_data = response.request.post_data
-
-                            print(f"\n  [{site}] API CALL DETECTED")
-                            print(f"  Method:   {method}")
-                            print(f"  URL:      {req_url}")
-                            if post_data:
-                                print(f"  Body:     {post_data[:300]}")
-                            print(f"  Response: {str(body)[:400]}")
-                            print(f"  *** Copy this URL into {config['api_url_var']} ***\n")
-                    except Exception:
-                        pass
+                    raw, _ = hit
+                    method = response.request.method
+                    req_url = response.url
+                    post_data = response.request.post_data
+
+                    print(f"\n  [{site}] API CALL DETECTED")
+                    print(f"  Method:   {method}")
+                    print(f"  URL:      {req_url}")
+                    if post_data:
+                        print(f"  Body:     {post_data[:300]}")
+                    # Preview the raw JSON text; repr() of a multi-MB body
+                    # would format all of it just to print 400 chars
+                    print(f"  Response: {raw[:400].decode('utf-8', 'replace')}")
+                    print(f"  *** Copy this URL into {config['api_url_var']} ***\n")
 
                 page.on("response", on_response)
 
@@ -231,93 +314,239 @@ async def discover_apis():
 # Fast — no browser overhead. 2017-2025 typically completes in <2 min.
 # ══════════════════════════════════════════════════════════════════════════════
 
-def fetch_direct(api_url: str, year_param: str, years: list,
-                 auth_header: dict = None, source: str = "") -> list:
-    if requests is None:
-        print("ERROR: requests not installed. Run: pip install requests")
-        return []
+async def fetch_direct(session, sem, api_url: str, year_param: str, years: list,
+                       auth_header: dict = None, source: str = "",
+                       cache_dir: Path = None, refresh: bool = False,
+                       pool: ProcessPoolExecutor = None) -> list:
+    """
+    Fetch every year from a site's events API concurrently.
+
+    Year requests go out together on the shared aiohttp session, bounded by
+    the shared semaphore (see DIRECT_MAX_CONCURRENCY), so wall time is
+    roughly one round-trip instead of one per year.
+
+    With cache_dir set, a year whose cached response is younger than
+    HTTP_CACHE_TTL is served from disk, and freshly fetched responses that
+    normalize cleanly are saved there. refresh skips the lookup but still
+    saves.
+
+    pool is the shared process pool for parsing large runs of responses
+    (see _normalize_bodies); without one, parsing stays in-process.
+    """
+    fetched = set()  # years that went to the network this run
+
+    # Base headers (DIRECT_HEADERS) live on the session; only auth is per site
+    async def fetch_year(year):
+        if cache_dir is not None and not refresh:
+            raw = _cache_read(_cache_path(cache_dir, api_url, year_param, year))
+            if raw is not None:
+                return 200, raw
+        async with sem:
+            result = await _request(session, "GET", api_url, params={year_param: year}, headers=auth_header)
+        fetched.add(year)
+        return result
+
+    results = await asyncio.gather(
+        *[fetch_year(year) for year in years],
+        return_exceptions=True
+    )
 
-    base_headers = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
-        "Accept": "application/json, text/plain, */*",
+    bodies = {
+        year: result[1] for year, result in zip(years, results)
+        if not isinstance(result, Exception) and result[0] == 200
     }
-    if auth_header:
-        base_headers.update(auth_header)
+    normalized = dict(zip(bodies, await _normalize_bodies(
+        [(raw, f"{api_url}?{year_param}={year}") for year, raw in bodies.items()],
+        source, pool
+    )))
 
     all_events = []
 
-    for year in years:
-        try:
-            resp = requests.get(
-                api_url,
-                params={year_param: year},
-                headers=base_headers,
-                timeout=15
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                events = normalize_events(
-                    data,
-                    source=source,
-                    source_url=f"{api_url}?{year_param}={year}"
-                )
-                for e in events:
-                    if not e.get("year"):
-                        e["year"] = year
-                all_events.extend(events)
-                print(f"  [{source}] {year}: {len(events)} events")
-            else:
-                print(f"  [{source}] {year}: HTTP {resp.status_code}")
-        except Exception as e:
-            print(f"  [{source}] {year}: ERROR - {e}")
+    for year, result in zip(years, results):
+        if isinstance(result, Exception):
+            print(f"  [{source}] {year}: ERROR - {str(result) or type(result).__name__}")
+            continue
+
+        status, _ = result
+        if status != 200:
+            print(f"  [{source}] {year}: HTTP {status}")
+            continue
+
+        events = normalized[year]
+        if isinstance(events, Exception):
+            print(f"  [{source}] {year}: ERROR - {events}")
+            continue
+
+        if cache_dir is not None and year in fetched:
+            _cache_write(_cache_path(cache_dir, api_url, year_param, year), bodies[year])
+
+        for e in events:
+            if not e.get("year"):
+                e["year"] = year
+        all_events.extend(events)
+        print(f"  [{source}] {year}: {len(events)} events{'' if year in fetched else ' (cached)'}")
 
     return all_events
 
 
+def _cache_path(cache_dir: Path, api_url: str, year_param: str, year) -> Path:
+    """Cache file for one year's response, named by a hash of the request."""
+    key = hashlib.blake2b(f"{api_url}?{year_param}={year}".encode(), digest_size=16).hexdigest()
+    return cache_dir / f"{key}.json"
+
+
+def _cache_read(path: Path):
+    """Return the cached body at path if it is younger than HTTP_CACHE_TTL, else None."""
+    try:
+        if time.time() - path.stat().st_mtime < HTTP_CACHE_TTL:
+            return path.read_bytes()
+    except OSError:
+        pass
+    return None
+
+
+def _cache_write(path: Path, raw: bytes):
+    """
+    Save raw to path atomically: readers never see a half-written file.
+
+    The cache is only an optimization, so a failed write (read-only output
+    dir, full disk) is reported and skipped rather than raised.
+    """
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(raw)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"  [Cache] WARNING - could not write {path}: {e}")
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+async def _request(session, method: str, url: str, read_body: bool = True, **kwargs) -> tuple:
+    """
+    Send one request, retrying transient failures with exponential backoff.
+
+    Returns (status, body); body is the raw bytes of a 200 response when
+    read_body is set, else None. Connection errors and timeouts on the
+    last attempt are raised.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        last_try = attempt == MAX_RETRIES
+        try:
+            async with session.request(method, url, **kwargs) as resp:
+                if resp.status == 200:
+                    # Raw bytes: parsed later, possibly in a worker process
+                    return resp.status, (await resp.read() if read_body else None)
+                if resp.status not in RETRY_STATUSES or last_try:
+                    return resp.status, None
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last_try:
+                raise
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+def _parse_and_normalize(raw: bytes, source: str, source_url: str) -> list:
+    """Parse one JSON response body and normalize it (process-pool friendly)."""
+    return normalize_events(_json_loads(raw), source=source, source_url=source_url)
+
+
+async def _normalize_bodies(bodies: list, source: str, pool: ProcessPoolExecutor = None) -> list:
+    """
+    Parse + normalize (raw_body, source_url) pairs, in order.
+
+    Large runs are fanned out across pool since parsing and normalizing
+    are pure CPU work; small ones (or any run, when pool is None) stay
+    in-process, where the hand-off would cost more than it saves. Each
+    result is either the event list or the exception raised for that body.
+    """
+    if (pool is not None and len(bodies) > 1
+            and sum(len(raw) for raw, _ in bodies) >= PARALLEL_NORMALIZE_MIN_BYTES):
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *[loop.run_in_executor(pool, _parse_and_normalize, raw, source, url)
+              for raw, url in bodies],
+            return_exceptions=True
+        )
+
+    results = []
+    for raw, url in bodies:
+        try:
+            results.append(_parse_and_normalize(raw, source, url))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # PLAYWRIGHT MODE
 # Full browser scrape. Fallback when API is authenticated or obfuscated.
 # ══════════════════════════════════════════════════════════════════════════════
 
-async def scrape_playwright(site_key: str, urls: list, years: list) -> list:
-    if async_playwright is None:
-        print("ERROR: playwright not installed.")
-        return []
+# Resource types that never carry race data; aborted in playwright mode
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+
+
+async def _block_static_assets(route):
+    """Route handler: abort static asset requests, let everything else through."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
+
+async def scrape_playwright(browser, site_key: str, urls: list, years: list) -> list:
+    """
+    Scrape one site in its own context on a shared, already-launched browser.
+
+    Contexts are cheap and isolated (cookies, cache), so several sites can
+    be scraped concurrently on one browser process.
+    """
     all_events = []
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        page = await browser.new_page()
-        event_buffer = []
+    context = await browser.new_context()
+    try:
+        await context.route("**/*", _block_static_assets)
+        page = await context.new_page()
+        captured = []  # (method, url) of each API response that yielded events
+        data_seen = asyncio.Event()  # set whenever an XHR yields race events
 
         async def on_response(response):
-            if response.request.resource_type not in ("xhr", "fetch"):
+            hit = await _read_api_json(response, _SCRAPE_KEYWORDS_RE)
+            if hit is None:
                 return
+            _, body = hit
+            # Normalize immediately so the body isn't held until the end
+            events = normalize_events(body, source=site_key, source_url=response.url)
+            # Keyword hits with no events (analytics, config) are neither
+            # reported as captured nor allowed to end a wait
+            if events:
+                all_events.extend(events)
+                captured.append((response.request.method, response.url))
+                data_seen.set()
+
+        async def wait_for_data(timeout):
+            # Return as soon as race data arrives, or after timeout seconds
             try:
-                body = await response.json()
-                body_str = json.dumps(body).lower()
-                if any(k in body_str for k in ["event", "race", "marathon", "result"]):
-                    event_buffer.append({
-                        "url": response.url,
-                        "body": body,
-                        "method": response.request.method,
-                    })
-            except Exception:
+                await asyncio.wait_for(data_seen.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
                 pass
+            data_seen.clear()
 
         page.on("response", on_response)
 
         for url in urls:
             print(f"  [{site_key}] Loading {url}...")
             try:
-                await page.goto(url, wait_until="networkidle", timeout=30000)
-                await asyncio.sleep(3)
+                data_seen.clear()
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                await wait_for_data(PLAYWRIGHT_DATA_TIMEOUT)
 
-                # Scroll to trigger lazy-loaded content
-                for _ in range(3):
-                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(1)
+                # Scroll once to trigger lazy-loaded content, then let the page
+                # go idle (at most 500ms) so any lazy XHRs get fired
+                await page.evaluate(SCROLL_AND_IDLE_JS)
 
                 # Try interacting with year dropdowns
                 selects = await page.query_selector_all("select")
@@ -329,24 +558,26 @@ async def scrape_playwright(site_key: str, urls: list, years: list) -> list:
                         if text and text.strip().isdigit():
                             year = int(text.strip())
                             if year in years:
+                                # Drop any signal left by the scroll or the
+                                # previous option so the wait is for this one
+                                data_seen.clear()
                                 await sel.select_option(value=val)
-                                await asyncio.sleep(2)
+                                await wait_for_data(2)
 
             except Exception as e:
                 print(f"    Error: {e}")
 
-        print(f"\n  [{site_key}] API responses captured: {len(event_buffer)}")
-        for item in event_buffer:
-            print(f"    {item['method']} {item['url']}")
-            events = normalize_events(item["body"], source=site_key, source_url=item["url"])
-            all_events.extend(events)
+        print(f"\n  [{site_key}] API responses captured: {len(captured)}")
+        for method, url in captured:
+            print(f"    {method} {url}")
 
         # DOM fallback: extract option elements as race names
         try:
-            options = await page.query_selector_all("option")
-            for opt in options:
-                text = await opt.text_content()
-                val = await opt.get_attribute("value")
+            # One browser round-trip for all options instead of two per option
+            options = await page.eval_on_selector_all(
+                "option", "els => els.map(e => [e.textContent, e.getAttribute('value')])"
+            )
+            for text, val in options:
                 text = text.strip() if text else ""
                 # Skip year/number options; keep race name options
                 if text and len(text) > 5 and not text.isdigit():
@@ -361,14 +592,14 @@ async def scrape_playwright(site_key: str, urls: list, years: list) -> list:
                     })
         except Exception:
             pass
-
-        await browser.close()
+    finally:
+        await context.close()
 
     # Deduplicate within single site
     seen = set()
     unique = []
     for e in all_events:
-        key = e.get("race_name", "").lower().strip()
+        key = normalize_name(e.get("race_name") or "")
         if key and key not in seen:
             seen.add(key)
             unique.append(e)
@@ -377,87 +608,6 @@ async def scrape_playwright(site_key: str, urls: list, years: list) -> list:
     return unique
 
 
-# ══════════════════════════════════════════════════════════════════════════════
-# NORMALIZER
-# Flattens any API response shape into standard WONE event records.
-# ══════════════════════════════════════════════════════════════════════════════
-
-def normalize_events(raw, source: str, source_url: str) -> list:
-    """
-    Accepts any API response shape and returns a list of normalized event dicts.
-
-    Handles:
-      - List at root: [{"name": ...}, ...]
-      - Nested under common keys: {"events": [...], "data": [...], ...}
-      - Single event dict
-
-    Output schema:
-      race_name, race_date, city, distances, participant_count,
-      timing_company, source_url
-    """
-    items = []
-
-    if isinstance(raw, list):
-        items = raw
-    elif isinstance(raw, dict):
-        for key in ["events", "data", "results", "races", "items", "list", "eventList", "Events"]:
-            if key in raw and isinstance(raw[key], list):
-                items = raw[key]
-                break
-        if not items and any(k in raw for k in ["name", "event_name", "race_name", "title"]):
-            items = [raw]  # Single event dict
-
-    events = []
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-
-        # Field extraction with key fallbacks (camelCase, snake_case, PascalCase)
-        name = _first(item, [
-            "event_name", "name", "race_name", "title",
-            "EventName", "eventName", "RaceName", "event"
-        ])
-        date = _first(item, [
-            "race_date", "date", "event_date", "start_date",
-            "EventDate", "eventDate", "RaceDate", "scheduled_date"
-        ])
-        city = _first(item, [
-            "city", "location", "venue", "place", "City", "Location", "Venue"
-        ])
-        participants = _first(item, [
-            "participant_count", "participants", "total_participants",
-            "count", "total_runners", "finishers", "ParticipantCount"
-        ])
-        distances = _first(item, [
-            "categories", "distances", "race_types", "events",
-            "Categories", "Distances", "race_categories"
-        ])
-        event_id = _first(item, ["id", "event_id", "race_id", "EventId"])
-
-        if name and str(name).strip():
-            events.append({
-                "race_name":        str(name).strip(),
-                "race_date":        str(date).strip() if date else "",
-                "city":             str(city).strip() if city else "",
-                "distances":        str(distances).strip() if distances else "",
-                "participant_count": str(participants).strip() if participants else "",
-                "event_id":         str(event_id).strip() if event_id else "",
-                "timing_company":   source,
-                "source_url":       source_url,
-            })
-
-    return events
-
-
-def _first(d: dict, keys: list):
-    """Return the first non-None, non-empty value from a list of dict keys."""
-    for k in keys:
-        v = d.get(k)
-        if v is not None and str(v).strip():
-            return v
-    return None
-
-
 # ══════════════════════════════════════════════════════════════════════════════
 # DEDUP
 # ══════════════════════════════════════════════════════════════════════════════
@@ -466,41 +616,22 @@ def dedup_registry(events: list) -> list:
     """
     Removes duplicates from combined registry.
 
-    Strategy:
+    Strategy (see normalizer.fuzzy_dedup_events):
     1. Exact match: race_name (normalized) + year -> keep first occurrence
-    2. Flag probable duplicates for manual review (different sources, same name + year)
+    2. Near match: fuzzy race_name similarity within the same year -> keep first
     """
-    if not PANDAS_AVAILABLE:
-        print("[Dedup] pandas not available. Skipping dedup.")
-        return events
-
-    df = pd.DataFrame(events)
-    if df.empty:
+    if not events:
         return events
 
-    # Normalize race_name for comparison
-    df["_name_norm"] = (
-        df["race_name"]
-        .str.lower()
-        .str.strip()
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.replace(r'[^\w\s]', '', regex=True)
-    )
-
-    # Extract year from race_date if not already present
-    if "year" not in df.columns:
-        df["year"] = pd.to_datetime(df["race_date"], errors="coerce").dt.year
+    clean, dups = fuzzy_dedup_events(events)
 
-    # Mark duplicates (keep first)
-    df["_is_dup"] = df.duplicated(subset=["_name_norm", "year"], keep="first")
-
-    dups = df[df["_is_dup"]]
-    if not dups.empty:
+    if dups:
         print(f"[Dedup] Removed {len(dups)} duplicates:")
-        for _, row in dups.iterrows():
-            print(f"  - {row['race_name']} ({row.get('year', '?')}) [{row['timing_company']}]")
+        print("\n".join(
+            f"  - {e.get('race_name')} ({e.get('year') or e.get('race_date') or '?'}) [{e.get('timing_company')}]"
+            for e in dups
+        ))
 
-    clean = df[~df["_is_dup"]].drop(columns=["_name_norm", "_is_dup"]).to_dict("records")
     print(f"[Dedup] {len(events)} → {len(clean)} events after dedup")
     return clean
 
@@ -514,23 +645,103 @@ FIELDNAMES = [
     "participant_count", "timing_company", "source_url", "event_id"
 ]
 
-def export_csv(events: list, filename: str):
+# 1 MiB write buffer: large exports hit the disk in big chunks, not 8 KiB ones
+EXPORT_BUFFER_SIZE = 1 << 20
+EXPORT_BATCH_ROWS  = 1000
+
+def export_csv(events: Iterable[dict], filename: str):
+    """
+    Write events (any iterable, consumed once) to OUTPUT_DIR / filename.
+
+    Rows are streamed to disk in batches, so a generator or chain of
+    per-site lists is never materialized as one combined list.
+    """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     path = OUTPUT_DIR / filename
 
-    if not events:
+    events = iter(events)
+    first = next(events, None)
+    if first is None:
         print(f"[Export] No data for {filename}")
         return path
 
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction="ignore")
-        writer.writeheader()
-        writer.writerows(events)
-
-    print(f"[Export] {len(events):,} events → {path}")
+    # Plain csv.writer over pre-projected rows: skips DictWriter's per-row
+    # generator and extrasaction handling
+    fields = FIELDNAMES
+    rows = ([e.get(k, "") for k in fields] for e in chain((first,), events))
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for batch in iter(lambda: list(islice(rows, EXPORT_BATCH_ROWS)), []):
+            writer.writerows(batch)
+            count += len(batch)
+
+    print(f"[Export] {count:,} events → {path}")
     return path
 
 
+async def csv_writer_task(queue: asyncio.Queue, filename: str) -> int:
+    """
+    Append event lists from queue to OUTPUT_DIR / filename until a None
+    sentinel arrives.
+
+    Queue items are (site index, events), with indices 0..n-1. Sites may
+    finish in any order, but rows are always written in index order: a list
+    that arrives early is held until every earlier site has been written,
+    so the combined CSV (and which record --dedup keeps) never depends on
+    network timing. Anything still held at the sentinel is written in index
+    order. Like export_csv, no file is created if no rows arrive. File
+    I/O runs in a worker thread so other sites' requests keep flowing.
+    """
+    path = OUTPUT_DIR / filename
+    fields = FIELDNAMES
+    f = writer = None
+    count = 0
+
+    def write(events):
+        nonlocal f, writer, count
+        rows = ([e.get(k, "") for k in fields] for e in events)
+        for batch in iter(lambda: list(islice(rows, EXPORT_BATCH_ROWS)), []):
+            if writer is None:
+                OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+                f = open(path, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE)
+                writer = csv.writer(f)
+                writer.writerow(fields)
+            writer.writerows(batch)
+            count += len(batch)
+
+    pending = {}  # site index -> events that arrived ahead of their turn
+    next_index = 0
+    try:
+        while (item := await queue.get()) is not None:
+            index, events = item
+            pending[index] = events
+            while next_index in pending:
+                await asyncio.to_thread(write, pending.pop(next_index))
+                next_index += 1
+        for index in sorted(pending):
+            await asyncio.to_thread(write, pending[index])
+    finally:
+        if f is not None:
+            # Closing flushes up to EXPORT_BUFFER_SIZE bytes: keep it off the loop too
+            await asyncio.to_thread(f.close)
+
+    if count:
+        print(f"[Export] {count:,} events → {path}")
+    else:
+        print(f"[Export] No data for {filename}")
+    return count
+
+
+async def _export_site(queue: asyncio.Queue, index: int, site_key: str, events: list):
+    """Write site_key's own CSV, then hand its events to the combined writer as site index."""
+    slug = site_key.lower().replace(" ", "_")
+    # In a worker thread: other sites are still fetching on the event loop
+    await asyncio.to_thread(export_csv, events, f"race_registry_{slug}.csv")
+    await queue.put((index, events))
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # TIMINGINDIA SLUG ENUMERATOR
 # TimingIndia's results live at ifinish.in/eventresult/result-{Slug}-{Year}.
@@ -538,7 +749,7 @@ def export_csv(events: list, filename: str):
 # Use this as a fallback when TIMINGINDIA_EVENTS_API is not available.
 # ══════════════════════════════════════════════════════════════════════════════
 
-def fetch_timingindia_via_slugs(years: list) -> list:
+async def fetch_timingindia_via_slugs(session, sem, years: list) -> list:
     """
     Enumerate TimingIndia events by probing known ifinish.in result URLs.
 
@@ -546,38 +757,48 @@ def fetch_timingindia_via_slugs(years: list) -> list:
     constructs the expected URL and checks if it returns a 200.
     Successful hits are recorded as event stubs (name + year + source_url).
 
-    No API call needed — relies solely on HTTP HEAD requests.
+    No API call needed — relies solely on HTTP HEAD requests, all issued
+    concurrently on the shared session (bounded by sem).
     """
-    if requests is None:
-        print("ERROR: requests not installed.")
-        return []
-
-    found = []
     base = "https://ifinish.in/eventresult/result"
     headers = {"User-Agent": "Mozilla/5.0 (compatible; WONE-registry-bot/1.0)"}
+    timeout = aiohttp.ClientTimeout(total=8)
+    probes = [
+        (slug, year, f"{base}-{slug}-{year}")
+        for slug in TIMINGINDIA_KNOWN_SLUGS
+        for year in years
+    ]
+
+    async def probe(url):
+        async with sem:
+            status, _ = await _request(
+                session, "HEAD", url, read_body=False,
+                headers=headers, timeout=timeout, allow_redirects=True
+            )
+            return status == 200
 
     print(f"  [TimingIndia] Probing {len(TIMINGINDIA_KNOWN_SLUGS)} slugs × {len(years)} years...")
-    for slug in TIMINGINDIA_KNOWN_SLUGS:
-        for year in years:
-            url = f"{base}-{slug}-{year}"
-            try:
-                resp = requests.head(url, headers=headers, timeout=8, allow_redirects=True)
-                if resp.status_code == 200:
-                    # Derive a human-readable name from slug
-                    name = slug.replace("-", " ")
-                    found.append({
-                        "race_name":        name,
-                        "race_date":        str(year),
-                        "city":             "",
-                        "distances":        "",
-                        "participant_count": "",
-                        "event_id":         slug,
-                        "timing_company":   "TimingIndia",
-                        "source_url":       url,
-                    })
-                    print(f"    ✓ {name} {year}")
-            except Exception as e:
-                pass  # Slug/year combo doesn't exist — expected
+    results = await asyncio.gather(
+        *[probe(url) for _, _, url in probes],
+        return_exceptions=True  # Network errors just count as misses
+    )
+
+    found = []
+    for (slug, year, url), hit in zip(probes, results):
+        if hit is True:
+            # Derive a human-readable name from slug
+            name = slug.replace("-", " ")
+            found.append({
+                "race_name":        name,
+                "race_date":        str(year),
+                "city":             "",
+                "distances":        "",
+                "participant_count": "",
+                "event_id":         slug,
+                "timing_company":   "TimingIndia",
+                "source_url":       url,
+            })
+            print(f"    ✓ {name} {year}")
 
     print(f"  [TimingIndia] Found {len(found)} events via slug enumeration")
     return found
@@ -615,6 +836,16 @@ Examples:
         action="store_true",
         help="Run dedup pass on existing combined CSV"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Direct mode: don't read or write the on-disk API response cache"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Direct mode: re-fetch every year, replacing cached responses"
+    )
     parser.add_argument(
         "--years",
         type=str,
@@ -651,12 +882,17 @@ Examples:
         if not combined_path.exists():
             print(f"ERROR: {combined_path} not found. Run --mode=direct first.")
             return
-        if not PANDAS_AVAILABLE:
+        # pandas is only needed to read the CSV back, so import it here
+        # rather than paying its import cost on every scrape run.
+        try:
+            import pandas as pd
+        except ImportError:
             print("ERROR: pandas required for dedup. Run: pip install pandas")
             return
-        df = pd.read_csv(combined_path)
-        events = df.to_dict("records")
-        clean = dedup_registry(events)
+        # Every column as the exact text written: no dtype inference pass,
+        # blanks stay "" rather than NaN, and IDs like "0042" keep their form
+        df = pd.read_csv(combined_path, dtype=str, keep_default_na=False, engine="c")
+        clean = dedup_registry(df.to_dict("records"))
         export_csv(clean, "race_registry_combined_deduped.csv")
         return
 
@@ -667,85 +903,87 @@ Examples:
 
     # ── Direct mode ────────────────────────────────────────────────────────
     if mode == "direct":
-        all_events_by_site = {}
+        if aiohttp is None:
+            print("ERROR: aiohttp not installed. Run: pip install aiohttp")
+            return
+
+        # Combined CSV is written by one consumer as each site finishes
+        combined = asyncio.Queue()
+        writer = asyncio.create_task(csv_writer_task(combined, "race_registry_combined.csv"))
+
+        # One process pool shared by every site; workers only start once a
+        # site's responses cross PARALLEL_NORMALIZE_MIN_BYTES
+        pool = ProcessPoolExecutor()
 
         # Helper: run a site if not filtered out
         def _should_run(key):
             return site_filter is None or site_filter == key.lower()
 
-        if _should_run("sts"):
-            if STS_EVENTS_API:
-                print("Fetching STS events (direct API)...")
-                all_events_by_site["STS"] = fetch_direct(
-                    STS_EVENTS_API, STS_YEAR_PARAM, years,
-                    auth_header=STS_AUTH_HEADER, source="STS"
-                )
-            else:
-                print("STS_EVENTS_API not set — run --discover first.\n")
-                all_events_by_site["STS"] = []
-
-        if _should_run("ifinish"):
-            if IFINISH_EVENTS_API:
-                print("\nFetching iFinish events (direct API)...")
-                all_events_by_site["iFinish"] = fetch_direct(
-                    IFINISH_EVENTS_API, IFINISH_YEAR_PARAM, years,
-                    auth_header=IFINISH_AUTH_HEADER, source="iFinish"
-                )
-            else:
-                print("IFINISH_EVENTS_API not set — run --discover first.\n")
-                all_events_by_site["iFinish"] = []
-
-        if _should_run("mysamay"):
-            if MYSAMAY_EVENTS_API:
-                print("\nFetching MySamay events (direct API)...")
-                all_events_by_site["MySamay"] = fetch_direct(
-                    MYSAMAY_EVENTS_API, MYSAMAY_YEAR_PARAM, years,
-                    auth_header=MYSAMAY_AUTH_HEADER, source="MySamay"
-                )
-            else:
-                print("MYSAMAY_EVENTS_API not set — run --discover first.\n")
-                all_events_by_site["MySamay"] = []
-
-        if _should_run("timingindia"):
-            if TIMINGINDIA_EVENTS_API:
-                print("\nFetching TimingIndia events (direct API via ifinish.in)...")
-                all_events_by_site["TimingIndia"] = fetch_direct(
-                    TIMINGINDIA_EVENTS_API, TIMINGINDIA_YEAR_PARAM, years,
-                    auth_header=TIMINGINDIA_AUTH_HEADER, source="TimingIndia"
-                )
-            else:
-                print("\nTIMINGINDIA_EVENTS_API not set.")
-                print("Falling back to slug enumeration via ifinish.in result URLs...")
-                all_events_by_site["TimingIndia"] = fetch_timingindia_via_slugs(years)
-
-        if _should_run("myraceindia"):
-            if MYRACEINDIA_EVENTS_API:
-                print("\nFetching MyRaceIndia events (direct API)...")
-                all_events_by_site["MyRaceIndia"] = fetch_direct(
-                    MYRACEINDIA_EVENTS_API, MYRACEINDIA_YEAR_PARAM, years,
-                    auth_header=MYRACEINDIA_AUTH_HEADER, source="MyRaceIndia"
-                )
-            else:
-                print("MYRACEINDIA_EVENTS_API not set — run --discover first.\n")
-                all_events_by_site["MyRaceIndia"] = []
-
-        # Export per-site CSVs and combined
-        all_combined = []
-        for site_key, events in all_events_by_site.items():
-            slug = site_key.lower().replace(" ", "_")
-            export_csv(events, f"race_registry_{slug}.csv")
-            all_combined.extend(events)
+        # One pooled session and one in-flight cap shared by every site
+        connector = aiohttp.TCPConnector(
+            limit=DIRECT_MAX_CONCURRENCY, limit_per_host=DIRECT_MAX_PER_HOST
+        )
+        timeout = aiohttp.ClientTimeout(total=15)
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout, headers=DIRECT_HEADERS
+            ) as session:
+                sem = asyncio.BoundedSemaphore(DIRECT_MAX_CONCURRENCY)
 
-        if all_combined:
-            export_csv(all_combined, "race_registry_combined.csv")
+                async def _fetch_site(index, site_key, api_url, year_param, auth_header):
+                    events = []
+                    try:
+                        if api_url:
+                            print(f"Fetching {site_key} events (direct API)...")
+                            events = await fetch_direct(
+                                session, sem,
+                                api_url, year_param, years,
+                                auth_header=auth_header, source=site_key,
+                                cache_dir=None if args.no_cache else HTTP_CACHE_DIR,
+                                refresh=args.refresh, pool=pool
+                            )
+                        elif site_key == "TimingIndia":
+                            print("TIMINGINDIA_EVENTS_API not set.")
+                            print("Falling back to slug enumeration via ifinish.in result URLs...")
+                            events = await fetch_timingindia_via_slugs(session, sem, years)
+                        else:
+                            print(f"{site_key.upper()}_EVENTS_API not set — run --discover first.")
+                    finally:
+                        # Always fill this site's slot (empty on failure) so the
+                        # combined writer never holds later sites behind it
+                        await _export_site(combined, index, site_key, events)
+
+                # Sites live on separate hosts, so fetch them all at once;
+                # sem and the connector still cap total and per-host load.
+                # The combined CSV is still written in direct_sites order.
+                direct_sites = [
+                    ("STS",         STS_EVENTS_API,         STS_YEAR_PARAM,         STS_AUTH_HEADER),
+                    ("iFinish",     IFINISH_EVENTS_API,     IFINISH_YEAR_PARAM,     IFINISH_AUTH_HEADER),
+                    ("MySamay",     MYSAMAY_EVENTS_API,     MYSAMAY_YEAR_PARAM,     MYSAMAY_AUTH_HEADER),
+                    ("TimingIndia", TIMINGINDIA_EVENTS_API, TIMINGINDIA_YEAR_PARAM, TIMINGINDIA_AUTH_HEADER),
+                    ("MyRaceIndia", MYRACEINDIA_EVENTS_API, MYRACEINDIA_YEAR_PARAM, MYRACEINDIA_AUTH_HEADER),
+                ]
+                direct_sites = [site for site in direct_sites if _should_run(site[0])]
+
+                results = await asyncio.gather(
+                    *[_fetch_site(index, *site) for index, site in enumerate(direct_sites)],
+                    return_exceptions=True
+                )
+                for (site_key, *_), result in zip(direct_sites, results):
+                    if isinstance(result, BaseException):
+                        print(f"  [{site_key}] ERROR - {str(result) or type(result).__name__}")
+        finally:
+            await combined.put(None)
+            await writer
+            # Shut down off the event loop: waiting on workers must not
+            # stall anything still scheduled on it
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
 
     # ── Playwright mode ────────────────────────────────────────────────────
     elif mode == "playwright":
         def _should_run(key):
             return site_filter is None or site_filter == key.lower()
 
-        all_combined = []
-
         sites_to_scrape = [
             ("STS",         SITE_CONFIGS["STS"]["discover_urls"]),
             ("iFinish",     SITE_CONFIGS["iFinish"]["discover_urls"]),
@@ -754,16 +992,51 @@ Examples:
             ("MyRaceIndia", SITE_CONFIGS["MyRaceIndia"]["discover_urls"]),
         ]
 
-        for site_key, urls in sites_to_scrape:
-            if not _should_run(site_key):
-                continue
-            events = await scrape_playwright(site_key, urls, years)
-            slug = site_key.lower().replace(" ", "_")
-            export_csv(events, f"race_registry_{slug}.csv")
-            all_combined.extend(events)
+        sites_to_scrape = [(k, u) for k, u in sites_to_scrape if _should_run(k)]
+
+        if async_playwright is None:
+            print("ERROR: playwright not installed.")
+            print("  Run: pip install playwright && playwright install chromium")
+            return
+
+        # One browser process for every site; each site gets its own context,
+        # with at most PLAYWRIGHT_MAX_CONTEXTS open at a time
+        context_slots = asyncio.Semaphore(PLAYWRIGHT_MAX_CONTEXTS)
+
+        # Each site is exported as soon as it finishes; one consumer
+        # appends it to the combined CSV in sites_to_scrape order
+        combined = asyncio.Queue()
+        writer = asyncio.create_task(csv_writer_task(combined, "race_registry_combined.csv"))
 
-        if all_combined:
-            export_csv(all_combined, "race_registry_combined.csv")
+        async def _scrape_site(browser, index, site_key, urls):
+            events = []
+            try:
+                async with context_slots:
+                    events = await scrape_playwright(browser, site_key, urls, years)
+            finally:
+                # Always fill this site's slot (empty on failure) so the
+                # combined writer never holds later sites behind it
+                await _export_site(combined, index, site_key, events)
+
+        try:
+            async with async_playwright() as pw:
+                browser = await pw.chromium.launch(headless=True)
+                try:
+                    # A failing site must not abort the gather: the others
+                    # would keep running while the browser closes under them
+                    results = await asyncio.gather(*[
+                        _scrape_site(browser, index, site_key, urls)
+                        for index, (site_key, urls) in enumerate(sites_to_scrape)
+                    ], return_exceptions=True)
+                finally:
+                    await browser.close()
+
+            for (site_key, _), result in zip(sites_to_scrape, results):
+                if isinstance(result, BaseException):
+                    print(f"  [{site_key}] ERROR - {str(result) or type(result).__name__}")
+        finally:
+            await combined.put(None)
+            await writer
 
     print("\nDone.")
 
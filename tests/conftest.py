@@ -0,0 +1,19 @@
+"""
+tests/conftest.py
+=================
+Shared pytest setup, loaded once before any test module is collected.
+"""
+
+import sys
+from pathlib import Path
+
+# Allow importing from scrapers/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def pytest_configure(config):
+    # Registered here so the marker is known with or without pytest-xdist
+    # installed; it only takes effect under `pytest -n auto --dist loadgroup`.
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run all tests in the group on one xdist worker"
+    )
@@ -5,67 +5,147 @@ Unit tests for the normalize_events() and dedup_events() utilities.
 
 Run:
   python -m pytest tests/ -v
+
+  # In parallel across cores (pip install pytest-xdist)
+  python -m pytest tests/ -n auto --dist loadgroup
 """
 
-import sys
-from pathlib import Path
+import pytest
 
-# Allow importing from scrapers/
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# scrapers/ is put on sys.path by tests/conftest.py
+from scrapers.normalizer import normalize_events, dedup_events, fuzzy_dedup_events, _extract_items, _SOURCE_ENVELOPE
 
-from scrapers.normalizer import normalize_events, dedup_events, _extract_items
+# Tests are pure, so xdist may spread modules across workers; this module
+# stays on one worker so the module-scoped normalized_cases fixture is
+# computed once rather than once per worker
+pytestmark = pytest.mark.xdist_group(name="normalizer")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # normalize_events tests
 # ─────────────────────────────────────────────────────────────────────────────
 
-class TestNormalizeEvents:
+# Inputs are module-level constants, built once at import. None of the
+# functions under test mutate their input, so sharing them is safe.
 
-    def test_list_at_root(self):
-        raw = [
+# (case id, raw response, source, source_url, expected fields per output event)
+NORMALIZE_CASES = (
+    (
+        "list_at_root",
+        [
             {"name": "Bengaluru Marathon 2024", "date": "2024-10-20", "city": "Bengaluru"},
             {"name": "Mumbai Half Marathon 2024", "date": "2024-01-15", "city": "Mumbai"},
-        ]
-        events = normalize_events(raw, source="STS", source_url="https://example.com/api")
-        assert len(events) == 2
-        assert events[0]["race_name"] == "Bengaluru Marathon 2024"
-        assert events[0]["race_date"] == "2024-10-20"
-        assert events[0]["timing_company"] == "STS"
-
-    def test_nested_under_events_key(self):
-        raw = {
-            "status": "ok",
-            "events": [
-                {"event_name": "Hyderabad 10K 2023", "event_date": "2023-12-03"}
-            ]
-        }
-        events = normalize_events(raw, source="iFinish", source_url="https://ifinish.in/api")
-        assert len(events) == 1
-        assert events[0]["race_name"] == "Hyderabad 10K 2023"
-        assert events[0]["timing_company"] == "iFinish"
-
-    def test_nested_under_data_key(self):
-        raw = {
-            "data": [
-                {"title": "Pune Half Marathon", "start_date": "2024-02-18", "location": "Pune"}
-            ]
-        }
-        events = normalize_events(raw, source="STS", source_url="https://example.com")
-        assert len(events) == 1
-        assert events[0]["race_name"] == "Pune Half Marathon"
-        assert events[0]["city"] == "Pune"
+        ],
+        "STS", "https://example.com/api",
+        [
+            {"race_name": "Bengaluru Marathon 2024", "race_date": "2024-10-20", "timing_company": "STS"},
+            {"race_name": "Mumbai Half Marathon 2024"},
+        ],
+    ),
+    (
+        "nested_under_events_key",
+        {"status": "ok", "events": [{"event_name": "Hyderabad 10K 2023", "event_date": "2023-12-03"}]},
+        "iFinish", "https://ifinish.in/api",
+        [{"race_name": "Hyderabad 10K 2023", "timing_company": "iFinish"}],
+    ),
+    (
+        "nested_under_data_key",
+        {"data": [{"title": "Pune Half Marathon", "start_date": "2024-02-18", "location": "Pune"}]},
+        "STS", "https://example.com",
+        [{"race_name": "Pune Half Marathon", "city": "Pune"}],
+    ),
+    (
+        "single_event_dict",
+        {"event_name": "Chennai Trail Run", "race_date": "2024-03-10"},
+        "MySamay", "https://example.com",
+        [{"race_name": "Chennai Trail Run"}],
+    ),
+    (
+        "key_fallbacks_camelCase",
+        [{"eventName": "Jaipur Marathon", "eventDate": "2024-11-24"}],
+        "iFinish", "",
+        [{"race_name": "Jaipur Marathon", "race_date": "2024-11-24"}],
+    ),
+    (
+        "key_fallbacks_PascalCase",
+        [{"EventName": "Kolkata Run", "EventDate": "2024-06-02", "City": "Kolkata"}],
+        "STS", "",
+        [{"race_name": "Kolkata Run", "city": "Kolkata"}],
+    ),
+    (
+        "participant_count_extracted",
+        [{"name": "Goa Marathon", "total_runners": 3200}],
+        "STS", "",
+        [{"participant_count": "3200"}],
+    ),
+    (
+        "distances_extracted",
+        [{"name": "Ahmedabad Marathon", "categories": "5K, 10K, 21K, FM"}],
+        "STS", "",
+        [{"distances": "5K, 10K, 21K, FM"}],
+    ),
+    (
+        "source_url_preserved",
+        [{"name": "Test Race"}],
+        "STS", "https://sportstimingsolutions.in/api/events?year=2024",
+        [{"source_url": "https://sportstimingsolutions.in/api/events?year=2024"}],
+    ),
+)
+
+
+# Every empty shape a response body can take
+EMPTY_RESPONSES = (
+    pytest.param(None, id="none"),
+    pytest.param([], id="empty_list"),
+    pytest.param({}, id="empty_dict"),
+)
+
+
+@pytest.fixture(scope="module")
+def normalized_cases():
+    """normalize_events output for every NORMALIZE_CASES entry, computed once per module."""
+    return {
+        case_id: normalize_events(raw, source=source, source_url=source_url)
+        for case_id, raw, source, source_url, _ in NORMALIZE_CASES
+    }
+
 
-    def test_single_event_dict(self):
-        raw = {"event_name": "Chennai Trail Run", "race_date": "2024-03-10"}
-        events = normalize_events(raw, source="MySamay", source_url="https://example.com")
+class TestNormalizeEvents:
+
+    @pytest.mark.parametrize("case_id, expected", [
+        pytest.param(case_id, expected, id=case_id)
+        for case_id, *_, expected in NORMALIZE_CASES
+    ])
+    def test_normalize(self, normalized_cases, case_id, expected):
+        events = normalized_cases[case_id]
+        assert len(events) == len(expected)
+        for event, fields in zip(events, expected):
+            for field, value in fields.items():
+                assert event[field] == value
+
+    def test_source_envelope_miss_falls_back(self):
+        raw = {"results": [{"name": "Mysuru Half Marathon"}]}
+        events = normalize_events(raw, source="STS", source_url="")
         assert len(events) == 1
-        assert events[0]["race_name"] == "Chennai Trail Run"
+        assert events[0]["race_name"] == "Mysuru Half Marathon"
 
-    def test_empty_response(self):
-        assert normalize_events({}, source="STS", source_url="") == []
-        assert normalize_events([], source="STS", source_url="") == []
-        assert normalize_events(None, source="STS", source_url="") == []
+    def test_unseeded_source_uses_generic_probe(self):
+        raw = {"total": 1, "races": [{"name": "Kaveri Trail Marathon"}]}
+        events = normalize_events(raw, source="EnvelopeTest", source_url="")
+        assert events[0]["race_name"] == "Kaveri Trail Marathon"
+
+    def test_seeded_envelope_preferred_over_probe_order(self):
+        raw = {"events": [{"name": "Promo Banner"}], "data": [{"name": "Delhi Half Marathon"}]}
+        events = normalize_events(raw, source="iFinish", source_url="")
+        assert [e["race_name"] for e in events] == ["Delhi Half Marathon"]
+
+    def test_seeded_envelope_not_modified(self):
+        normalize_events({"results": [{"name": "Mysuru Half Marathon"}]}, source="STS", source_url="")
+        assert _SOURCE_ENVELOPE["STS"] == "events"
+
+    @pytest.mark.parametrize("empty", EMPTY_RESPONSES)
+    def test_empty_response(self, empty):
+        assert normalize_events(empty, source="STS", source_url="") == []
 
     def test_skips_items_without_name(self):
         raw = [
@@ -76,80 +156,200 @@ class TestNormalizeEvents:
         assert len(events) == 1
         assert events[0]["race_name"] == "Delhi Marathon"
 
-    def test_key_fallbacks_camelCase(self):
-        raw = [{"eventName": "Jaipur Marathon", "eventDate": "2024-11-24"}]
-        events = normalize_events(raw, source="iFinish", source_url="")
-        assert events[0]["race_name"] == "Jaipur Marathon"
-        assert events[0]["race_date"] == "2024-11-24"
+    def test_blank_values_fall_through_to_next_key(self):
+        raw = [{"event_name": "   ", "name": "  Surat Night Run ", "date": None, "event_date": "2024-12-01"}]
+        events = normalize_events(raw, source="STS", source_url="")
+        assert events[0]["race_name"] == "Surat Night Run"
+        assert events[0]["race_date"] == "2024-12-01"
 
-    def test_key_fallbacks_PascalCase(self):
-        raw = [{"EventName": "Kolkata Run", "EventDate": "2024-06-02", "City": "Kolkata"}]
+    def test_blank_name_is_not_an_event(self):
+        raw = [{"name": " \t ", "date": "2024-01-01"}, {"name": "Pune Half Marathon"}]
         events = normalize_events(raw, source="STS", source_url="")
-        assert events[0]["race_name"] == "Kolkata Run"
-        assert events[0]["city"] == "Kolkata"
+        assert [e["race_name"] for e in events] == ["Pune Half Marathon"]
+
+    @pytest.mark.parametrize("name", [0, False, [], {}])
+    def test_falsy_non_string_name_is_not_an_event(self, name):
+        assert normalize_events([{"name": name, "date": "2024-01-01"}], source="STS", source_url="") == []
 
-    def test_participant_count_extracted(self):
-        raw = [{"name": "Goa Marathon", "total_runners": 3200}]
+    def test_missing_fields_are_empty_strings(self):
+        raw = [{"name": "Nashik Run", "id": 0}]
         events = normalize_events(raw, source="STS", source_url="")
-        assert events[0]["participant_count"] == "3200"
+        assert events[0]["city"] == ""
+        assert events[0]["event_id"] == "0"
 
-    def test_distances_extracted(self):
-        raw = [{"name": "Ahmedabad Marathon", "categories": "5K, 10K, 21K, FM"}]
+    def test_mixed_keys_within_response(self):
+        raw = [
+            {"title": "Kochi Marathon", "venue": "Kochi"},
+            {"title": "Thrissur Run", "city": "Thrissur"},
+        ]
         events = normalize_events(raw, source="STS", source_url="")
-        assert events[0]["distances"] == "5K, 10K, 21K, FM"
+        assert [e["race_name"] for e in events] == ["Kochi Marathon", "Thrissur Run"]
+        assert [e["city"] for e in events] == ["Kochi", "Thrissur"]
 
-    def test_source_url_preserved(self):
-        raw = [{"name": "Test Race"}]
-        url = "https://sportstimingsolutions.in/api/events?year=2024"
-        events = normalize_events(raw, source="STS", source_url=url)
-        assert events[0]["source_url"] == url
+    def test_higher_priority_key_wins_within_response(self):
+        raw = [
+            {"name": "Short"},
+            {"event_name": "Official Name", "name": "short"},
+        ]
+        events = normalize_events(raw, source="STS", source_url="")
+        assert [e["race_name"] for e in events] == ["Short", "Official Name"]
+
+    def test_output_independent_of_earlier_calls(self):
+        item = {"event_name": "Official Name", "name": "short"}
+        normalize_events([{"name": "Short"}], source="STS", source_url="")
+        events = normalize_events([item], source="STS", source_url="")
+        assert events[0]["race_name"] == "Official Name"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # dedup_events tests
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Shared, read-only dedup inputs. Values repeated across inputs are named
+# once so the variants below visibly differ from the same base record.
+BENGALURU_MARATHON = "Bengaluru Marathon"
+BENGALURU_DATE     = "2024-10-20"
+STS                = "STS"
+
+EXACT_DUPLICATES = (
+    {"race_name": BENGALURU_MARATHON, "race_date": BENGALURU_DATE, "timing_company": STS},
+    {"race_name": BENGALURU_MARATHON, "race_date": BENGALURU_DATE, "timing_company": STS},
+)
+SAME_RACE_TWO_YEARS = (
+    {"race_name": BENGALURU_MARATHON, "race_date": BENGALURU_DATE},
+    {"race_name": BENGALURU_MARATHON, "race_date": "2023-10-15"},
+)
+CASE_VARIANTS = (
+    {"race_name": "bengaluru marathon", "race_date": BENGALURU_DATE},
+    {"race_name": BENGALURU_MARATHON, "race_date": BENGALURU_DATE},
+)
+WHITESPACE_VARIANTS = (
+    {"race_name": BENGALURU_MARATHON, "race_date": BENGALURU_DATE},
+    {"race_name": " Bengaluru   \tMarathon ", "race_date": BENGALURU_DATE},
+)
+PUNCTUATION_VARIANTS = (
+    {"race_name": "NMDC Hyderabad Marathon", "race_date": "2024-08-25"},
+    {"race_name": "NMDC Hyderabad-Marathon!", "race_date": "2024-08-25"},
+)
+ORDERED_RACES = (
+    {"race_name": "Race A", "race_date": "2024-01-01"},
+    {"race_name": "Race B", "race_date": "2024-02-01"},
+    {"race_name": "Race C", "race_date": "2024-03-01"},
+)
+
+
 class TestDedupEvents:
 
     def test_removes_exact_duplicates(self):
-        events = [
-            {"race_name": "Bengaluru Marathon", "race_date": "2024-10-20", "timing_company": "STS"},
-            {"race_name": "Bengaluru Marathon", "race_date": "2024-10-20", "timing_company": "STS"},
-        ]
-        unique, dups = dedup_events(events)
+        unique, dups = dedup_events(EXACT_DUPLICATES)
         assert len(unique) == 1
         assert len(dups) == 1
 
     def test_different_years_not_duplicates(self):
-        events = [
-            {"race_name": "Bengaluru Marathon", "race_date": "2024-10-20"},
-            {"race_name": "Bengaluru Marathon", "race_date": "2023-10-15"},
-        ]
-        unique, dups = dedup_events(events)
+        unique, dups = dedup_events(SAME_RACE_TWO_YEARS)
         assert len(unique) == 2
         assert len(dups) == 0
 
     def test_case_insensitive_dedup(self):
-        events = [
-            {"race_name": "bengaluru marathon", "race_date": "2024-10-20"},
-            {"race_name": "Bengaluru Marathon", "race_date": "2024-10-20"},
-        ]
-        unique, dups = dedup_events(events)
+        unique, dups = dedup_events(CASE_VARIANTS)
+        assert len(unique) == 1
+
+    def test_whitespace_runs_collapsed(self):
+        unique, dups = dedup_events(WHITESPACE_VARIANTS)
         assert len(unique) == 1
 
+    def test_punctuation_ignored(self):
+        unique, dups = dedup_events(PUNCTUATION_VARIANTS)
+        assert len(unique) == 1
+        assert len(dups) == 1
+
     def test_empty_input(self):
         unique, dups = dedup_events([])
         assert unique == []
         assert dups == []
 
     def test_preserves_order(self):
+        unique, _ = dedup_events(ORDERED_RACES)
+        assert tuple(e["race_name"] for e in unique) == ("Race A", "Race B", "Race C")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# fuzzy_dedup_events tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestFuzzyDedupEvents:
+
+    def test_removes_typo_duplicates(self):
+        events = [
+            {"race_name": "Mumbai Marathon", "race_date": "2024-01-21", "timing_company": "STS"},
+            {"race_name": "Mumbai Maraton", "race_date": "2024-01-21", "timing_company": "iFinish"},
+        ]
+        unique, dups = fuzzy_dedup_events(events)
+        assert [e["timing_company"] for e in unique] == ["STS"]
+        assert [e["timing_company"] for e in dups] == ["iFinish"]
+
+    def test_ignores_punctuation_and_whitespace(self):
+        events = [
+            {"race_name": "Tata Steel Kolkata 25K", "race_date": "2023-12-17"},
+            {"race_name": "Tata  Steel, Kolkata 25K!", "race_date": "2023-12-17"},
+        ]
+        unique, dups = fuzzy_dedup_events(events)
+        assert len(unique) == 1
+        assert len(dups) == 1
+
+    def test_hyphen_and_space_equivalent(self):
+        events = [
+            {"race_name": "Pinkathon Half-Marathon", "race_date": "2024-03-03"},
+            {"race_name": "Pinkathon Half Marathon", "race_date": "2024-03-03"},
+        ]
+        unique, dups = fuzzy_dedup_events(events)
+        assert len(unique) == 1
+        assert len(dups) == 1
+
+    def test_different_distances_not_duplicates(self):
+        events = [
+            {"race_name": "Hyderabad 10K Run", "race_date": "2024-08-25"},
+            {"race_name": "Hyderabad 21K Run", "race_date": "2024-08-25"},
+        ]
+        unique, dups = fuzzy_dedup_events(events)
+        assert len(unique) == 2
+        assert dups == []
+
+    def test_different_years_not_duplicates(self):
+        events = [
+            {"race_name": "Vizag River Marathon", "race_date": "2023-12-10"},
+            {"race_name": "Vizag River Marathon", "year": 2024},
+        ]
+        unique, dups = fuzzy_dedup_events(events)
+        assert len(unique) == 2
+
+    def test_different_cities_not_fuzzy_merged(self):
         events = [
-            {"race_name": "Race A", "race_date": "2024-01-01"},
-            {"race_name": "Race B", "race_date": "2024-02-01"},
-            {"race_name": "Race C", "race_date": "2024-03-01"},
+            {"race_name": "Run for Rivers Goa", "race_date": "2024-06-05", "city": "Goa"},
+            {"race_name": "Run for Rivers Gaya", "race_date": "2024-06-05", "city": "Gaya"},
         ]
-        unique, _ = dedup_events(events)
-        assert [e["race_name"] for e in unique] == ["Race A", "Race B", "Race C"]
+        unique, dups = fuzzy_dedup_events(events)
+        assert len(unique) == 2
+        assert dups == []
+
+    def test_missing_city_still_fuzzy_merged(self):
+        events = [
+            {"race_name": "Mumbai Marathon", "race_date": "2024-01-21", "city": "Mumbai"},
+            {"race_name": "Mumbai Maraton", "race_date": "2024-01-21", "city": ""},
+        ]
+        unique, dups = fuzzy_dedup_events(events)
+        assert len(unique) == 1
+
+    def test_dissimilar_names_kept(self):
+        events = [
+            {"race_name": "Mumbai Marathon", "race_date": "2024-01-21"},
+            {"race_name": "Mumbai Half Marathon", "race_date": "2024-01-21"},
+        ]
+        unique, _ = fuzzy_dedup_events(events)
+        assert len(unique) == 2
+
+    def test_empty_input(self):
+        assert fuzzy_dedup_events([]) == ([], [])
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -176,7 +376,6 @@ class TestExtractItems:
         assert len(result) == 1
         assert result[0]["name"] == "Solo Race"
 
-    def test_empty_returns_empty(self):
-        assert _extract_items({}) == []
-        assert _extract_items([]) == []
-        assert _extract_items(None) == []
+    @pytest.mark.parametrize("empty", EMPTY_RESPONSES)
+    def test_empty_returns_empty(self, empty):
+        assert _extract_items(empty) == []
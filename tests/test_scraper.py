@@ -0,0 +1,173 @@
+"""
+tests/test_scraper.py
+=====================
+Unit tests for the race_registry_scraper export and direct-mode helpers.
+No network or browser: HTTP runs against a local stub session.
+
+Run:
+  python -m pytest tests/ -v
+"""
+
+import asyncio
+import csv
+import os
+
+import pytest
+
+# scrapers/ is put on sys.path by tests/conftest.py
+from scrapers import race_registry_scraper as scraper
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Point OUTPUT_DIR at a per-test temporary directory."""
+    monkeypatch.setattr(scraper, "OUTPUT_DIR", tmp_path)
+    return tmp_path
+
+
+def _read_names(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["race_name"] for row in csv.DictReader(f)]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# csv_writer_task tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestCsvWriterTask:
+
+    def _run(self, items):
+        async def go():
+            queue = asyncio.Queue()
+            task = asyncio.create_task(scraper.csv_writer_task(queue, "combined.csv"))
+            for item in items:
+                await queue.put(item)
+                await asyncio.sleep(0)
+            await queue.put(None)
+            return await task
+        return asyncio.run(go())
+
+    def test_rows_written_in_site_order(self, output_dir):
+        count = self._run([
+            (2, [{"race_name": "C"}]),
+            (0, [{"race_name": "A1"}, {"race_name": "A2"}]),
+            (1, [{"race_name": "B"}]),
+        ])
+        assert count == 4
+        assert _read_names(output_dir / "combined.csv") == ["A1", "A2", "B", "C"]
+
+    def test_held_sites_flushed_in_order_at_sentinel(self, output_dir):
+        self._run([(2, [{"race_name": "C"}]), (1, [{"race_name": "B"}])])
+        assert _read_names(output_dir / "combined.csv") == ["B", "C"]
+
+    def test_no_rows_no_file(self, output_dir):
+        assert self._run([(0, []), (1, [])]) == 0
+        assert not (output_dir / "combined.csv").exists()
+
+
+def test_export_site_writes_csv_and_queues_slot(output_dir):
+    async def go():
+        queue = asyncio.Queue()
+        await scraper._export_site(queue, 3, "My Site", [{"race_name": "Ooty Ultra"}])
+        return queue.get_nowait()
+
+    index, events = asyncio.run(go())
+    assert index == 3
+    assert [e["race_name"] for e in events] == ["Ooty Ultra"]
+    assert _read_names(output_dir / "race_registry_my_site.csv") == ["Ooty Ultra"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# fetch_direct response cache tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+API_URL = "https://api.example.com/events"
+
+
+class _StubResponse:
+    status = 200
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self._body
+
+
+class StubSession:
+    """Stands in for aiohttp.ClientSession: serves bodies[year] and logs each request."""
+
+    def __init__(self, bodies: dict):
+        self.bodies = bodies
+        self.requested = []
+
+    def request(self, method, url, params=None, **kwargs):
+        year = params["year"]
+        self.requested.append(year)
+        return _StubResponse(self.bodies[year])
+
+
+def _events_body(name: str) -> bytes:
+    return ('{"events": [{"name": "%s"}]}' % name).encode()
+
+
+class TestFetchDirectCache:
+
+    def _fetch(self, session, cache_dir, refresh=False):
+        async def go():
+            return await scraper.fetch_direct(
+                session, asyncio.Semaphore(4), API_URL, "year", [2024],
+                source="CacheSite", cache_dir=cache_dir, refresh=refresh
+            )
+        return asyncio.run(go())
+
+    def _cache_file(self, cache_dir):
+        return scraper._cache_path(cache_dir, API_URL, "year", 2024)
+
+    def test_fresh_entry_served_from_disk(self, tmp_path):
+        self._fetch(StubSession({2024: _events_body("Pune Marathon")}), tmp_path)
+        session = StubSession({2024: _events_body("Changed")})
+        events = self._fetch(session, tmp_path)
+        assert session.requested == []
+        assert [e["race_name"] for e in events] == ["Pune Marathon"]
+
+    def test_expired_entry_refetched(self, tmp_path):
+        self._fetch(StubSession({2024: _events_body("Pune Marathon")}), tmp_path)
+        stale = self._cache_file(tmp_path).stat().st_mtime - scraper.HTTP_CACHE_TTL - 1
+        os.utime(self._cache_file(tmp_path), (stale, stale))
+
+        session = StubSession({2024: _events_body("Pune Marathon 2024")})
+        events = self._fetch(session, tmp_path)
+        assert session.requested == [2024]
+        assert [e["race_name"] for e in events] == ["Pune Marathon 2024"]
+        assert self._cache_file(tmp_path).read_bytes() == _events_body("Pune Marathon 2024")
+
+    def test_refresh_overwrites_entry(self, tmp_path):
+        self._fetch(StubSession({2024: _events_body("Pune Marathon")}), tmp_path)
+        session = StubSession({2024: _events_body("Pune Marathon 2024")})
+        self._fetch(session, tmp_path, refresh=True)
+        assert session.requested == [2024]
+        assert self._cache_file(tmp_path).read_bytes() == _events_body("Pune Marathon 2024")
+
+    def test_unparseable_body_not_cached(self, tmp_path):
+        events = self._fetch(StubSession({2024: b"<html>rate limited</html>"}), tmp_path)
+        assert events == []
+        assert not self._cache_file(tmp_path).exists()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_unwritable_cache_keeps_fetched_events(self, tmp_path):
+        blocked = tmp_path / "not_a_dir"
+        blocked.write_text("")  # cache dir path is a file: every write fails
+        events = self._fetch(StubSession({2024: _events_body("Pune Marathon")}), blocked)
+        assert [e["race_name"] for e in events] == ["Pune Marathon"]
+
+    def test_no_cache_dir_writes_nothing(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self._fetch(StubSession({2024: _events_body("Pune Marathon")}), None)
+        assert list(tmp_path.iterdir()) == []